@@ -0,0 +1,53 @@
+"""Measure WorkEvaluator throughput as the number of model replicas grows.
+
+Usage: python benchmark_evaluator.py --replicas 1 2 4 8 --submissions 64
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+import torch
+
+from work_evaluator import WorkEvaluator
+
+async def run(num_replicas: int, submissions: int, batch_size: int, intra_op_threads) -> float:
+    # Same configuration path as production, so the numbers reflect real settings.
+    evaluator = WorkEvaluator({
+        'eval_replicas': num_replicas,
+        'eval_batch_size': batch_size,
+        'eval_intra_op_threads': intra_op_threads,
+    })
+    template = evaluator.model.state_dict()
+    state_dicts = [{name: torch.randn_like(t) for name, t in template.items()} for _ in range(submissions)]
+
+    await evaluator.evaluate(state_dicts[0])  # warm-up
+    start = time.perf_counter()
+    await asyncio.gather(*(evaluator.evaluate(sd) for sd in state_dicts))
+    elapsed = time.perf_counter() - start
+    evaluator.close()
+    return submissions / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--replicas', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--submissions', type=int, default=64)
+    parser.add_argument('--batch-size', type=int, default=1024)
+    parser.add_argument('--intra-op-threads', type=int, default=None,
+                        help="torch threads per op; defaults to the evaluator's cpus // replicas")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    print(f"cpus={os.cpu_count()} submissions={args.submissions} batch_size={args.batch_size}")
+    baseline = None
+    for num_replicas in args.replicas:
+        # Mirror the evaluator's default so the single-replica run gets every core too.
+        threads = args.intra_op_threads or max(1, (os.cpu_count() or 1) // num_replicas)
+        throughput = asyncio.run(run(num_replicas, args.submissions, args.batch_size, threads))
+        baseline = baseline or throughput
+        print(f"replicas={num_replicas:<3d} intra_op_threads={torch.get_num_threads():<3d} "
+              f"{throughput:8.2f} evals/s  speedup={throughput / baseline:.2f}x")
+
+if __name__ == '__main__':
+    main()
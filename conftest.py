@@ -0,0 +1,2 @@
+# Present so pytest puts the repository root on sys.path: the tests import the
+# top-level modules (work_evaluator, pool_manager, ...) directly.
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+def _as_bool(value) -> bool:
+    """Interpret config values, which arrive as strings when overridden from the environment."""
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
+
+def _collapse_stack(frame) -> str:
+    """Render a frame chain as a root-first, semicolon-separated stack."""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(parts))
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler that writes flamegraph collapsed stacks."""
+    def __init__(self, interval: float = 0.005, output_dir: str = '.'):
+        self.interval = interval
+        self.output_dir = output_dir
+        self.samples = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._timer: Optional[threading.Timer] = None
+        # The timer thread and a signal handler may both try to stop the same window.
+        self._lock = threading.RLock()
+        self._windows = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, duration: Optional[float] = None):
+        """Start sampling all threads, optionally stopping after `duration` seconds."""
+        with self._lock:
+            if self.is_running:
+                logger.warning("Profiler already running")
+                return
+            # Each window gets its own counter and stop event, so a window that is still
+            # being written out never shares state with the next one.
+            self.samples = Counter()
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop_event, self.samples),
+                                            name='sampling-profiler', daemon=True)
+            self._thread.start()
+            if duration:
+                self._timer = threading.Timer(duration, self.stop)
+                self._timer.daemon = True
+                self._timer.start()
+        logger.info(f"Sampling profiler started (interval={self.interval}s, duration={duration}s)")
+
+    def stop(self) -> Optional[str]:
+        """Stop sampling and write the collapsed-stack file. Returns its path."""
+        with self._lock:
+            if not self.is_running:
+                return None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            thread, samples = self._thread, self.samples
+            self._thread = None
+            self._stop_event.set()
+            self._windows += 1
+            window = self._windows
+        # Join and write outside the lock so toggle() never waits on file I/O.
+        thread.join()
+        return self.write_collapsed(samples, window)
+
+    def toggle(self, duration: Optional[float] = None):
+        """Start or stop a window without blocking the caller, e.g. the event loop."""
+        with self._lock:
+            if self.is_running:
+                threading.Thread(target=self.stop, name='sampling-profiler-stop', daemon=True).start()
+            else:
+                self.start(duration)
+
+    def _run(self, stop_event: threading.Event, samples: Counter):
+        own_ident = threading.get_ident()
+        while not stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_ident:
+                    continue
+                samples[_collapse_stack(frame)] += 1
+
+    def write_collapsed(self, samples: Counter, window: int) -> str:
+        """Write samples as `stack count` lines, as consumed by flamegraph.pl."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{window}.collapsed"
+        path = os.path.join(self.output_dir, name)
+        with open(path, 'w') as file:
+            for stack, count in samples.most_common():
+                file.write(f"{stack} {count}\n")
+        logger.info(f"Profiler wrote {sum(samples.values())} samples to {path}")
+        return path
+
+class LoopLagWatchdog:
+    """Measures event-loop lag and logs the stack that blocked the loop."""
+    def __init__(self, threshold: float = 0.25, interval: float = 0.1):
+        self.threshold = threshold
+        self.interval = interval
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._monitor: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """Start the watchdog. Must be called from the event loop being watched."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop_event.clear()
+        self._task = asyncio.create_task(self._tick())
+        self._monitor = threading.Thread(target=self._watch, name='loop-lag-watchdog', daemon=True)
+        self._monitor.start()
+        logger.info(f"Event loop watchdog started (threshold={self.threshold}s)")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._monitor is not None:
+            self._monitor.join()
+            self._monitor = None
+
+    async def _tick(self):
+        """Record how late each scheduled wake-up fires."""
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            self.last_lag = max(0.0, now - expected)
+            self.max_lag = max(self.max_lag, self.last_lag)
+            if self.last_lag > self.threshold:
+                logger.warning(f"Event loop lag of {self.last_lag:.3f}s detected")
+
+    def _watch(self):
+        """From a separate thread, catch the loop while it is still blocked."""
+        reported = False
+        while not self._stop_event.wait(self.interval):
+            stalled_for = time.monotonic() - self._heartbeat - self.interval
+            if stalled_for <= self.threshold:
+                reported = False
+                continue
+            if reported:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else '<unavailable>\n'
+            logger.warning(f"Event loop blocked for {stalled_for:.3f}s; blocking stack:\n{stack}")
+            reported = True
+
+    def stats(self) -> Dict[str, float]:
+        return {'last_lag': self.last_lag, 'max_lag': self.max_lag}
+
+class Diagnostics:
+    """Owns the on-demand profiler and the event-loop lag watchdog."""
+    def __init__(self, config: Dict[str, Any]):
+        self.profile_duration = float(config.get('profile_duration', 30.0))
+        self.profile_on_start = _as_bool(config.get('profile_on_start', False))
+        self.watchdog_enabled = _as_bool(config.get('loop_watchdog_enabled', True))
+        self.profiler = SamplingProfiler(
+            interval=float(config.get('profile_interval', 0.005)),
+            output_dir=config.get('profile_output_dir', 'profiles')
+        )
+        self.watchdog = LoopLagWatchdog(
+            threshold=float(config.get('loop_lag_threshold', 0.25)),
+            interval=float(config.get('loop_lag_interval', 0.1))
+        )
+
+    def start(self):
+        if self.watchdog_enabled:
+            self.watchdog.start()
+        if self.profile_on_start:
+            self.profiler.start(self.profile_duration)
+
+    def stop(self):
+        self.watchdog.stop()
+        self.profiler.stop()
+
+    def toggle_profiler(self):
+        """Start or stop a profiling window, e.g. from a SIGUSR1 handler."""
+        self.profiler.toggle(self.profile_duration)
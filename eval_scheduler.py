@@ -0,0 +1,197 @@
+import asyncio
+import heapq
+import io
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+import aiosqlite
+import torch
+
+logger = logging.getLogger(__name__)
+
+class EvaluationSchedulerError(Exception):
+    """Base exception for EvaluationScheduler errors."""
+    pass
+
+class SchedulerFullError(EvaluationSchedulerError):
+    """Raised when the backlog stays full for longer than the submit timeout."""
+    pass
+
+class EvaluationJob:
+    def __init__(self, job_id: int, hotkey: str, state_dict: Dict[str, torch.Tensor],
+                 enqueued_at: float, finish_tag: float):
+        self.job_id = job_id
+        self.hotkey = hotkey
+        self.state_dict = state_dict
+        self.enqueued_at = enqueued_at
+        self.finish_tag = finish_tag
+
+class EvaluationScheduler:
+    """Persistent evaluation queue with per-hotkey weighted fair queuing.
+
+    Each hotkey has at most one pending job: a newer submission replaces the
+    payload of the pending one but keeps its place in the queue. Jobs are
+    ordered by their virtual finish tag (self-clocked fair queuing), so a
+    hotkey that is evaluated repeatedly falls behind hotkeys that are not.
+    """
+    def __init__(self, config: Dict[str, Any], weight_fn: Optional[Callable[[str], float]] = None):
+        self.db_path = config.get('eval_queue_db', 'eval_queue.db')
+        self.max_backlog = int(config.get('eval_max_backlog', 1000))
+        self.submit_timeout = float(config.get('eval_submit_timeout', 5.0))
+        self.weight_fn = weight_fn or (lambda hotkey: 1.0)
+        self.db: Optional[aiosqlite.Connection] = None
+        self._pending: Dict[str, EvaluationJob] = {}
+        self._in_flight: Dict[int, EvaluationJob] = {}
+        self._heap = []
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._condition = asyncio.Condition()
+        self._wait_times = deque(maxlen=int(config.get('eval_wait_stats_window', 1000)))
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.completed = 0
+
+    async def initialize(self):
+        """Create the queue table and resume any jobs left over from a previous run."""
+        self.db = await aiosqlite.connect(self.db_path)
+        await self.db.execute('''
+            CREATE TABLE IF NOT EXISTS eval_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                hotkey TEXT NOT NULL,
+                enqueued_at REAL NOT NULL,
+                payload BLOB NOT NULL
+            )
+        ''')
+        await self.db.commit()
+
+        async with self.db.execute('SELECT id, hotkey, enqueued_at, payload FROM eval_jobs ORDER BY id') as cursor:
+            rows = await cursor.fetchall()
+        # Jobs that were in flight at shutdown are evaluated again; only the newest per hotkey survives.
+        newest = {}
+        for row in rows:
+            newest[row[1]] = row
+        stale = [row[0] for row in rows if newest[row[1]][0] != row[0]]
+        if stale:
+            await self.db.executemany('DELETE FROM eval_jobs WHERE id = ?', [(job_id,) for job_id in stale])
+            await self.db.commit()
+        for job_id, hotkey, enqueued_at, payload in sorted(newest.values()):
+            try:
+                state_dict = await self._run_in_executor(self._deserialize, payload)
+            except Exception as e:
+                logger.error(f"Dropping unreadable queued job {job_id} from {hotkey}: {e}")
+                await self.db.execute('DELETE FROM eval_jobs WHERE id = ?', (job_id,))
+                await self.db.commit()
+                continue
+            self._push(EvaluationJob(job_id, hotkey, state_dict, enqueued_at, self._finish_tag(hotkey)))
+        logger.info(f"Evaluation scheduler resumed {len(self._pending)} queued jobs")
+
+    async def close(self):
+        if self.db is not None:
+            await self.db.close()
+            self.db = None
+
+    @staticmethod
+    async def _run_in_executor(func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    @staticmethod
+    def _serialize(state_dict: Dict[str, torch.Tensor]) -> bytes:
+        buffer = io.BytesIO()
+        torch.save(state_dict, buffer)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _deserialize(payload: bytes) -> Dict[str, torch.Tensor]:
+        return torch.load(io.BytesIO(payload), map_location='cpu', weights_only=True)
+
+    def _finish_tag(self, hotkey: str) -> float:
+        weight = max(float(self.weight_fn(hotkey)), 1e-6)
+        start = max(self._virtual_time, self._last_finish.get(hotkey, 0.0))
+        finish = start + 1.0 / weight
+        self._last_finish[hotkey] = finish
+        return finish
+
+    def _push(self, job: EvaluationJob):
+        self._pending[job.hotkey] = job
+        heapq.heappush(self._heap, (job.finish_tag, job.job_id, job.hotkey))
+
+    async def submit(self, hotkey: str, state_dict: Dict[str, torch.Tensor], timeout: Optional[float] = None) -> int:
+        """Queue a submission, waiting for backlog space if needed. Returns the job id."""
+        timeout = self.submit_timeout if timeout is None else timeout
+        payload = await self._run_in_executor(self._serialize, state_dict)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        async with self._condition:
+            self.submitted += 1
+            while True:
+                job = self._pending.get(hotkey)
+                if job is not None:
+                    # Superseded: only the newest submission is evaluated, at the old position.
+                    await self.db.execute('UPDATE eval_jobs SET payload = ? WHERE id = ?', (payload, job.job_id))
+                    await self.db.commit()
+                    job.state_dict = state_dict
+                    self.coalesced += 1
+                    return job.job_id
+                if len(self._pending) < self.max_backlog:
+                    break
+                try:
+                    await asyncio.wait_for(self._condition.wait(), max(deadline - loop.time(), 0))
+                except asyncio.TimeoutError:
+                    self.rejected += 1
+                    raise SchedulerFullError(f"Evaluation backlog full ({self.max_backlog} jobs)")
+
+            enqueued_at = time.time()
+            cursor = await self.db.execute(
+                'INSERT INTO eval_jobs (hotkey, enqueued_at, payload) VALUES (?, ?, ?)',
+                (hotkey, enqueued_at, payload)
+            )
+            await self.db.commit()
+            job = EvaluationJob(cursor.lastrowid, hotkey, state_dict, enqueued_at, self._finish_tag(hotkey))
+            self._push(job)
+            self._condition.notify_all()
+            return job.job_id
+
+    async def next_job(self) -> EvaluationJob:
+        """Wait for and return the job with the smallest virtual finish tag."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: bool(self._pending))
+            finish_tag, job_id, hotkey = heapq.heappop(self._heap)
+            job = self._pending.pop(hotkey)
+            self._virtual_time = finish_tag
+            self._in_flight[job_id] = job
+            self._wait_times.append(time.time() - job.enqueued_at)
+            if len(self._last_finish) > 2 * self.max_backlog:
+                self._last_finish = {
+                    key: tag for key, tag in self._last_finish.items() if tag > self._virtual_time
+                }
+            self._condition.notify_all()
+            return job
+
+    async def complete(self, job: EvaluationJob):
+        """Remove a finished (or permanently failed) job from the persistent queue."""
+        self._in_flight.pop(job.job_id, None)
+        await self.db.execute('DELETE FROM eval_jobs WHERE id = ?', (job.job_id,))
+        await self.db.commit()
+        self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._wait_times)
+        now = time.time()
+        oldest = min((job.enqueued_at for job in self._pending.values()), default=None)
+        return {
+            'queue_depth': len(self._pending),
+            'in_flight': len(self._in_flight),
+            'max_backlog': self.max_backlog,
+            'submitted': self.submitted,
+            'coalesced': self.coalesced,
+            'rejected': self.rejected,
+            'completed': self.completed,
+            'oldest_wait': now - oldest if oldest is not None else 0.0,
+            'wait_mean': sum(waits) / len(waits) if waits else 0.0,
+            'wait_p50': waits[len(waits) // 2] if waits else 0.0,
+            'wait_p95': waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+            'wait_max': waits[-1] if waits else 0.0,
+        }
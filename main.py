@@ -36,6 +36,11 @@ class MiningPoolApp:
                 asyncio.get_running_loop().add_signal_handler(
                     sig, lambda s=sig: asyncio.create_task(self.shutdown(s))
                 )
+            # SIGUSR1 starts/stops a profiling window
+            if hasattr(signal, 'SIGUSR1'):
+                asyncio.get_running_loop().add_signal_handler(
+                    signal.SIGUSR1, self.pool_manager.diagnostics.toggle_profiler
+                )
             
             # Start the pool manager
             await self.pool_manager.start()
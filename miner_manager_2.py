@@ -1,17 +1,287 @@
 import asyncio
 import logging
+import mmap
+import os
+import struct
 import time
-from typing import Dict, Any
+import uuid
+from collections.abc import MutableMapping
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional, Tuple
 import aiosqlite
 import json
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Snapshot layout: header, hotkeys blob, eval versions blob, then 8-byte aligned float64
+# best_loss, int64 last_submission, int64 metadata offsets and int32 eval version index
+# (-1 for none) arrays, then the metadata blob.
+SNAPSHOT_MAGIC = b'MINERSN3'
+# magic, db_id, count, last_seq, hotkeys_len, versions_len, metadata_len
+SNAPSHOT_HEADER = struct.Struct('<8s16sQQQQQ')
+
+MINER_COLUMNS = 'hotkey, best_loss, last_submission, data_version, metadata'
+
+def _align8(n: int) -> int:
+    return (n + 7) & ~7
+
+def _raw_metadata(entry: Dict[str, Any]) -> str:
+    metadata = entry['metadata']
+    return metadata if isinstance(metadata, str) else json.dumps(metadata)
+
+def _pack_strings(strings: List[bytes]) -> Tuple[np.ndarray, bytes]:
+    """Concatenate encoded strings into a blob plus int64 start offsets (one extra at the end)."""
+    offsets = np.zeros(len(strings) + 1, dtype='<i8')
+    np.cumsum([len(s) for s in strings], out=offsets[1:])
+    return offsets, b''.join(strings)
+
+def _index_versions(versions: List[Optional[str]]) -> Tuple[List[str], np.ndarray]:
+    """Map eval versions to indexes into a table of the distinct ones, -1 standing for None."""
+    table = sorted({v for v in versions if v is not None})
+    ids = {version: i for i, version in enumerate(table)}
+    return table, np.fromiter((ids.get(v, -1) for v in versions), dtype='<i4', count=len(versions))
+
+class _MinerRows(NamedTuple):
+    """Column arrays of a snapshot, or of a full table scan when there is none."""
+    hotkeys: np.ndarray           # object array of str
+    best_loss: np.ndarray         # float64
+    last_submission: np.ndarray   # int64
+    version_idx: np.ndarray       # int32 index into `versions`, -1 for none
+    versions: List[str]
+    metadata_offsets: np.ndarray  # int64, len(hotkeys) + 1
+    metadata_blob: np.ndarray     # uint8
+
+    @classmethod
+    def from_entries(cls, hotkeys: List[str], entries: List[Tuple]) -> '_MinerRows':
+        """Build rows from (best_loss, last_submission, data_version, raw metadata) tuples."""
+        versions, version_idx = _index_versions([e[2] for e in entries])
+        offsets, blob = _pack_strings([(e[3] or '').encode() for e in entries])
+        hotkey_array = np.empty(len(hotkeys), dtype=object)
+        hotkey_array[:] = hotkeys
+        return cls(
+            hotkey_array,
+            # NULLs from rows written outside this manager become "unscored".
+            np.fromiter((np.inf if e[0] is None else e[0] for e in entries), dtype='<f8', count=len(entries)),
+            np.fromiter((e[1] or 0 for e in entries), dtype='<i8', count=len(entries)),
+            version_idx,
+            versions,
+            offsets,
+            np.frombuffer(blob, dtype=np.uint8),
+        )
+
+    def entry(self, i: int) -> Dict[str, Any]:
+        # Metadata stays as raw JSON until first accessed.
+        version = self.version_idx[i]
+        return {
+            'best_loss': float(self.best_loss[i]),
+            'last_submission': int(self.last_submission[i]),
+            'data_version': self.versions[version] if version >= 0 else None,
+            'metadata': self.metadata_blob[self.metadata_offsets[i]:self.metadata_offsets[i + 1]].tobytes().decode()
+        }
+
+class _FrozenMiners(NamedTuple):
+    """A consistent view of a MinerCache that can be serialized off the event loop."""
+    generation: int
+    rows: _MinerRows
+    keep: np.ndarray  # base rows that are neither changed nor removed
+    overlay_hotkeys: List[str]
+    overlay_entries: List[Tuple]
+
+class MinerCache(MutableMapping):
+    """Hotkey -> miner entry mapping backed by the column arrays of the last snapshot.
+
+    Opening a snapshot only builds a hotkey -> row index; entry dicts are
+    materialized on first access and kept in an overlay, which also holds
+    every added or changed miner. The base rows they replace are marked
+    shadowed, so startup and snapshot writes cost O(changes) in Python
+    rather than O(miners).
+    """
+    def __init__(self, rows: Optional[_MinerRows] = None):
+        self._generation = 0
+        self._set_rows(rows or _MinerRows.from_entries([], []))
+
+    def _set_rows(self, rows: _MinerRows):
+        self._rows = rows
+        self._index = dict(zip(rows.hotkeys.tolist(), range(len(rows.hotkeys))))
+        self._shadowed = np.zeros(len(rows.hotkeys), dtype=bool)
+        self._live = len(rows.hotkeys)
+        self._overlay: Dict[str, Dict[str, Any]] = {}
+        # Generation of the last change per hotkey, removals included.
+        self._changed: Dict[str, int] = {}
+
+    def _shadow(self, hotkey: str) -> Optional[int]:
+        i = self._index.get(hotkey)
+        if i is None or self._shadowed[i]:
+            return None
+        self._shadowed[i] = True
+        self._live -= 1
+        return i
+
+    def touch(self, hotkey: str):
+        """Record that an entry changed in place, so the next snapshot keeps the change."""
+        self._generation += 1
+        self._changed[hotkey] = self._generation
+
+    def __getitem__(self, hotkey: str) -> Dict[str, Any]:
+        entry = self._overlay.get(hotkey)
+        if entry is None:
+            i = self._shadow(hotkey)
+            if i is None:
+                raise KeyError(hotkey)
+            entry = self._overlay[hotkey] = self._rows.entry(i)
+        return entry
+
+    def __contains__(self, hotkey) -> bool:
+        if hotkey in self._overlay:
+            return True
+        i = self._index.get(hotkey)
+        return i is not None and not self._shadowed[i]
+
+    def __setitem__(self, hotkey: str, entry: Dict[str, Any]):
+        self._shadow(hotkey)
+        self._overlay[hotkey] = entry
+        self.touch(hotkey)
+
+    def __delitem__(self, hotkey: str):
+        if self._overlay.pop(hotkey, None) is None and self._shadow(hotkey) is None:
+            raise KeyError(hotkey)
+        self.touch(hotkey)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self._overlay)
+        yield from self._rows.hotkeys[~self._shadowed].tolist()
+
+    def __len__(self) -> int:
+        return len(self._overlay) + self._live
+
+    def best_losses(self, data_version: Optional[str] = None) -> Dict[str, float]:
+        """Best loss per miner, optionally only for miners scored on `data_version`."""
+        mask = ~self._shadowed
+        if data_version is not None:
+            try:
+                mask &= self._rows.version_idx == self._rows.versions.index(data_version)
+            except ValueError:
+                mask[:] = False
+        losses = dict(zip(self._rows.hotkeys[mask].tolist(), self._rows.best_loss[mask].tolist()))
+        for hotkey, entry in self._overlay.items():
+            if data_version is None or entry['data_version'] == data_version:
+                losses[hotkey] = entry['best_loss']
+        return losses
+
+    def freeze(self) -> _FrozenMiners:
+        """Capture the current contents; only the overlay is copied."""
+        hotkeys = list(self._overlay)
+        entries = [
+            (e['best_loss'], e['last_submission'], e['data_version'], _raw_metadata(e))
+            for e in self._overlay.values()
+        ]
+        return _FrozenMiners(self._generation, self._rows, ~self._shadowed, hotkeys, entries)
+
+    def rebase(self, rows: _MinerRows, generation: int):
+        """Switch to the rows of a snapshot taken at `generation`, keeping later changes."""
+        overlay = {h: e for h, e in self._overlay.items() if self._changed.get(h, 0) > generation}
+        changed = {h: g for h, g in self._changed.items() if g > generation}
+        self._set_rows(rows)
+        self._changed = changed
+        for hotkey in changed:
+            self._shadow(hotkey)
+        self._overlay = overlay
+
+def _snapshot_sections(frozen: _FrozenMiners, db_id: bytes, seq: int) -> List[bytes]:
+    """Lay out a frozen cache in the snapshot format. Runs in an executor."""
+    rows, keep = frozen.rows, frozen.keep
+    overlay = _MinerRows.from_entries(frozen.overlay_hotkeys, frozen.overlay_entries)
+    hotkeys = rows.hotkeys[keep].tolist() + frozen.overlay_hotkeys
+
+    # Merge the two version tables, dropping versions no miner refers to any more.
+    names = rows.versions + overlay.versions
+    version_idx = np.concatenate([
+        rows.version_idx[keep],
+        np.where(overlay.version_idx >= 0, overlay.version_idx + len(rows.versions), -1).astype('<i4'),
+    ])
+    used = np.unique(version_idx[version_idx >= 0]).tolist()
+    versions = sorted({names[i] for i in used})
+    ids = {version: i for i, version in enumerate(versions)}
+    # One spare slot at the end, so -1 (no version) maps to itself.
+    remap = np.full(len(names) + 1, -1, dtype='<i4')
+    for i in used:
+        remap[i] = ids[names[i]]
+    version_idx = remap[version_idx]
+    versions_blob = '\n'.join(versions).encode()
+
+    # Gather the kept base metadata with one vectorized copy instead of per-row slices.
+    starts = rows.metadata_offsets[:-1][keep]
+    lengths = (rows.metadata_offsets[1:] - rows.metadata_offsets[:-1])[keep]
+    kept_offsets = np.zeros(len(lengths) + 1, dtype='<i8')
+    np.cumsum(lengths, out=kept_offsets[1:])
+    gather = np.arange(kept_offsets[-1], dtype=np.int64) + np.repeat(starts - kept_offsets[:-1], lengths)
+    metadata_blob = rows.metadata_blob[gather].tobytes() + overlay.metadata_blob.tobytes()
+    offsets = np.concatenate([kept_offsets, overlay.metadata_offsets[1:] + kept_offsets[-1]])
+
+    hotkeys_blob = '\n'.join(hotkeys).encode()
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, db_id, len(hotkeys), seq,
+                                  len(hotkeys_blob), len(versions_blob), len(metadata_blob))
+    blobs_end = SNAPSHOT_HEADER.size + len(hotkeys_blob) + len(versions_blob)
+    return [
+        header, hotkeys_blob, versions_blob, b'\0' * (_align8(blobs_end) - blobs_end),
+        np.concatenate([rows.best_loss[keep], overlay.best_loss]).astype('<f8').tobytes(),
+        np.concatenate([rows.last_submission[keep], overlay.last_submission]).astype('<i8').tobytes(),
+        offsets.astype('<i8').tobytes(),
+        version_idx.astype('<i4').tobytes(),
+        metadata_blob,
+    ]
+
+def _read_snapshot(path: str) -> Tuple[bytes, int, _MinerRows]:
+    """Memory-map a snapshot. Returns its db id, change seq and rows; raises ValueError if unusable."""
+    with open(path, 'rb') as file:
+        # The mapping outlives the file object and stays alive as long as the arrays use it.
+        mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mm) < SNAPSHOT_HEADER.size:
+        raise ValueError("truncated snapshot")
+    magic, db_id, count, seq, hotkeys_len, versions_len, metadata_len = SNAPSHOT_HEADER.unpack_from(mm, 0)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("bad snapshot magic")
+    offset = SNAPSHOT_HEADER.size
+    arrays_start = _align8(offset + hotkeys_len + versions_len)
+    if arrays_start + 28 * count + 8 + metadata_len != len(mm):
+        raise ValueError("truncated snapshot")
+    hotkeys = mm[offset:offset + hotkeys_len].decode().split('\n') if count else []
+    offset += hotkeys_len
+    versions = mm[offset:offset + versions_len].decode().split('\n') if versions_len else []
+    if len(hotkeys) != count:
+        raise ValueError("hotkey count does not match header")
+
+    offset = arrays_start
+    best_loss = np.frombuffer(mm, dtype='<f8', count=count, offset=offset)
+    offset += 8 * count
+    last_submission = np.frombuffer(mm, dtype='<i8', count=count, offset=offset)
+    offset += 8 * count
+    metadata_offsets = np.frombuffer(mm, dtype='<i8', count=count + 1, offset=offset)
+    offset += 8 * (count + 1)
+    version_idx = np.frombuffer(mm, dtype='<i4', count=count, offset=offset)
+    offset += 4 * count
+    metadata_blob = np.frombuffer(mm, dtype=np.uint8, count=metadata_len, offset=offset)
+    hotkey_array = np.empty(count, dtype=object)
+    hotkey_array[:] = hotkeys
+    rows = _MinerRows(hotkey_array, best_loss, last_submission, version_idx, versions,
+                      metadata_offsets, metadata_blob)
+    return db_id, seq, rows
+
 class MinerManager:
-    def __init__(self, db_path: str = 'miners.db'):
+    def __init__(self, db_path: str = 'miners.db', snapshot_path: Optional[str] = None,
+                 snapshot_interval: float = 300.0):
         self.db_path = db_path
+        self.snapshot_path = snapshot_path if snapshot_path is not None else f"{db_path}.snapshot"
+        self.snapshot_interval = snapshot_interval
         self.lock = asyncio.Lock()
-        self.miners_cache = {}
+        self.miners_cache = MinerCache()
+        # Highest miner_changes sequence number reflected in the cache.
+        self._applied_seq = 0
+        # Random id of the database, so a snapshot is never applied to a different one.
+        self._db_id = b''
+        self._snapshot_task: Optional[asyncio.Task] = None
+        # Held from serializing through pruning the change log, so two snapshot writes never interleave.
+        self._snapshot_lock = asyncio.Lock()
 
     async def initialize(self):
         """Initialize the database and load miners into cache."""
@@ -21,42 +291,239 @@ class MinerManager:
                     hotkey TEXT PRIMARY KEY,
                     best_loss REAL,
                     last_submission INTEGER,
+                    data_version TEXT,
                     metadata TEXT
                 )
             ''')
+            await self._migrate_miners_table(db)
+            # Change log fed by triggers, so a snapshot only needs the rows changed after it.
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS miner_changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    hotkey TEXT NOT NULL
+                )
+            ''')
+            for event, ref in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+                await db.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS miners_log_{event.lower()}
+                    AFTER {event} ON miners
+                    BEGIN
+                        INSERT INTO miner_changes (hotkey) VALUES ({ref}.hotkey);
+                    END
+                ''')
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS miner_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            ''')
+            await db.execute(
+                "INSERT OR IGNORE INTO miner_meta (key, value) VALUES ('db_id', ?)", (uuid.uuid4().hex,)
+            )
             await db.commit()
+            async with db.execute("SELECT value FROM miner_meta WHERE key = 'db_id'") as cursor:
+                self._db_id = bytes.fromhex((await cursor.fetchone())[0])
+            max_seq = await self._max_change_seq(db)
+
+        if self._load_snapshot(max_seq):
+            await self._replay_changes()
+        else:
+            await self._load_miners_to_cache()
+
+    @staticmethod
+    async def _migrate_miners_table(db):
+        """Add the columns missing from a `miners` table created by the older `database.Database`."""
+        async with db.execute('PRAGMA table_info(miners)') as cursor:
+            columns = {row[1] for row in await cursor.fetchall()}
+        if 'best_loss' not in columns:
+            await db.execute('ALTER TABLE miners ADD COLUMN best_loss REAL')
+            if 'performance' in columns:
+                # `performance` held the latest loss, with 0 meaning "never scored".
+                await db.execute(
+                    'UPDATE miners SET best_loss = CASE WHEN performance > 0 THEN performance ELSE ? END',
+                    (float('inf'),)
+                )
+            logger.info("Migrated miners table: added best_loss")
+        if 'metadata' not in columns:
+            await db.execute("ALTER TABLE miners ADD COLUMN metadata TEXT DEFAULT '{}'")
+            logger.info("Migrated miners table: added metadata")
+        if 'data_version' not in columns:
+            await db.execute('ALTER TABLE miners ADD COLUMN data_version TEXT')
+            logger.info("Migrated miners table: added data_version")
 
-        await self._load_miners_to_cache()
+    def start_snapshot_loop(self):
+        """Periodically write a cache snapshot in the background."""
+        if self._snapshot_task is None and self.snapshot_interval > 0:
+            self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+
+    async def close(self):
+        """Stop the snapshot loop and write a final snapshot for a warm restart."""
+        if self._snapshot_task is not None:
+            self._snapshot_task.cancel()
+            try:
+                await self._snapshot_task
+            except asyncio.CancelledError:
+                pass
+            self._snapshot_task = None
+        await self.write_snapshot()
+
+    async def _snapshot_loop(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            try:
+                await self.write_snapshot()
+            except Exception as e:
+                logger.error(f"Error writing miner snapshot: {e}")
 
     async def _load_miners_to_cache(self):
         """Load all miners from the database into the cache."""
         async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute('SELECT * FROM miners') as cursor:
-                async for row in cursor:
-                    self.miners_cache[row[0]] = {
-                        'best_loss': row[1],
-                        'last_submission': row[2],
-                        'metadata': json.loads(row[3])
-                    }
+            # Read the sequence first so rows changed during the scan are replayed later.
+            self._applied_seq = await self._max_change_seq(db)
+            async with db.execute(f'SELECT {MINER_COLUMNS} FROM miners') as cursor:
+                rows = await cursor.fetchall()
+        self.miners_cache = MinerCache(_MinerRows.from_entries([row[0] for row in rows], [row[1:] for row in rows]))
+
+    @staticmethod
+    def _entry_from_row(row) -> Dict[str, Any]:
+        # Metadata stays as raw JSON until first accessed.
+        return {
+            'best_loss': row[1],
+            'last_submission': row[2],
+            'data_version': row[3],
+            'metadata': row[4]
+        }
+
+    @staticmethod
+    async def _max_change_seq(db) -> int:
+        # sqlite_sequence keeps the high-water mark even after the log is pruned.
+        async with db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'miner_changes'") as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row else 0
+
+    async def _replay_changes(self):
+        """Refresh cache entries for miners changed in the database since `_applied_seq`."""
+        async with aiosqlite.connect(self.db_path) as db:
+            max_seq = await self._max_change_seq(db)
+            async with db.execute(
+                'SELECT DISTINCT hotkey FROM miner_changes WHERE seq > ? AND seq <= ?',
+                (self._applied_seq, max_seq)
+            ) as cursor:
+                changed = [row[0] for row in await cursor.fetchall()]
+
+            for start in range(0, len(changed), 500):
+                chunk = changed[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                async with db.execute(
+                    f'SELECT {MINER_COLUMNS} FROM miners WHERE hotkey IN ({placeholders})',
+                    chunk
+                ) as cursor:
+                    rows = {row[0]: row for row in await cursor.fetchall()}
+                for hotkey in chunk:
+                    row = rows.get(hotkey)
+                    if row is None:
+                        self.miners_cache.pop(hotkey, None)
+                    else:
+                        self.miners_cache[hotkey] = self._entry_from_row(row)
+            self._applied_seq = max_seq
+        logger.info(f"Replayed {len(changed)} changed miners up to change {max_seq}")
+
+    async def write_snapshot(self):
+        """Write the cache as a compact binary snapshot and prune the change log."""
+        if not self.snapshot_path or self.db_path == ':memory:' or not self._db_id:
+            return
+        async with self._snapshot_lock:
+            await self._write_snapshot()
+
+    async def _write_snapshot(self):
+        async with self.lock:
+            # Pick up rows written by other processes, so the snapshot's seq never claims
+            # changes the cache has not seen.
+            await self._replay_changes()
+            frozen = self.miners_cache.freeze()
+            seq = self._applied_seq
+
+        write = asyncio.get_running_loop().run_in_executor(None, self._write_snapshot_rows, frozen, seq)
+        try:
+            rows = await asyncio.shield(write)
+        except asyncio.CancelledError:
+            # Let the file write finish before the snapshot lock is released.
+            await write
+            raise
+
+        async with self.lock:
+            # Serve unchanged miners from the new file so the overlay only holds later changes.
+            self.miners_cache.rebase(rows, frozen.generation)
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute('DELETE FROM miner_changes WHERE seq <= ?', (seq,))
+            await db.commit()
+        logger.info(f"Wrote snapshot of {len(rows.hotkeys)} miners at change {seq}")
+
+    def _write_snapshot_rows(self, frozen: _FrozenMiners, seq: int) -> _MinerRows:
+        """Serialize and write a frozen cache, then map the new file. Runs in an executor."""
+        self._write_snapshot_file(_snapshot_sections(frozen, self._db_id, seq))
+        return _read_snapshot(self.snapshot_path)[2]
+
+    def _write_snapshot_file(self, sections):
+        """Write the snapshot atomically so a crash never leaves a torn file behind."""
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, 'wb') as file:
+                for section in sections:
+                    file.write(section)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _load_snapshot(self, max_seq: int) -> bool:
+        """Memory-map the snapshot as the cache's backing rows. Returns False if there is none usable."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            db_id, seq, rows = _read_snapshot(self.snapshot_path)
+            if db_id != self._db_id:
+                raise ValueError("snapshot belongs to a different database")
+            if seq > max_seq:
+                raise ValueError(f"snapshot is ahead of the database change log ({seq} > {max_seq})")
+        except Exception as e:
+            logger.warning(f"Ignoring unusable miner snapshot {self.snapshot_path}: {e}")
+            return False
+
+        self.miners_cache = MinerCache(rows)
+        self._applied_seq = seq
+        logger.info(f"Loaded snapshot of {len(rows.hotkeys)} miners at change {seq}")
+        return True
+
+    @staticmethod
+    def _metadata(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Return an entry's metadata, decoding the raw JSON on first access."""
+        if isinstance(entry['metadata'], str):
+            entry['metadata'] = json.loads(entry['metadata']) if entry['metadata'] else {}
+        return entry['metadata']
 
     async def register_miner(self, miner_hotkey: str) -> bool:
         """Register a new miner."""
         async with self.lock:
             if miner_hotkey in self.miners_cache:
-                logger.info(f"Miner {miner_hotkey} already registered")
+                logger.debug(f"Miner {miner_hotkey} already registered")
                 return False
 
             try:
                 async with aiosqlite.connect(self.db_path) as db:
                     await db.execute('''
-                        INSERT INTO miners (hotkey, best_loss, last_submission, metadata)
-                        VALUES (?, ?, ?, ?)
-                    ''', (miner_hotkey, float('inf'), 0, '{}'))
+                        INSERT INTO miners (hotkey, best_loss, last_submission, data_version, metadata)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', (miner_hotkey, float('inf'), 0, None, '{}'))
                     await db.commit()
 
                 self.miners_cache[miner_hotkey] = {
                     'best_loss': float('inf'),
                     'last_submission': 0,
+                    'data_version': None,
                     'metadata': {}
                 }
                 logger.info(f"Miner {miner_hotkey} registered successfully")
@@ -65,8 +532,13 @@ class MinerManager:
                 logger.error(f"Error registering miner {miner_hotkey}: {e}")
                 return False
 
-    async def update_miner_performance(self, miner_hotkey: str, loss: float):
-        """Update a miner's performance."""
+    async def update_miner_performance(self, miner_hotkey: str, loss: float, data_version: Optional[str] = None):
+        """Update a miner's performance.
+
+        Losses are only comparable on the same eval set, so a loss scored on a new
+        `data_version` replaces the best loss instead of competing with it. Callers
+        must therefore only pass results scored on the current eval set.
+        """
         async with self.lock:
             if miner_hotkey not in self.miners_cache:
                 logger.warning(f"Attempt to update non-existent miner {miner_hotkey}")
@@ -74,27 +546,32 @@ class MinerManager:
 
             try:
                 current_time = int(time.time())
-                if loss < self.miners_cache[miner_hotkey]['best_loss']:
-                    self.miners_cache[miner_hotkey]['best_loss'] = loss
+                entry = self.miners_cache[miner_hotkey]
+                if data_version is not None and entry['data_version'] != data_version:
+                    entry['data_version'] = data_version
+                    entry['best_loss'] = loss
+                elif loss < entry['best_loss']:
+                    entry['best_loss'] = loss
 
-                self.miners_cache[miner_hotkey]['last_submission'] = current_time
+                entry['last_submission'] = current_time
+                self.miners_cache.touch(miner_hotkey)
 
                 async with aiosqlite.connect(self.db_path) as db:
                     await db.execute('''
                         UPDATE miners 
-                        SET best_loss = ?, last_submission = ?
+                        SET best_loss = ?, last_submission = ?, data_version = ?
                         WHERE hotkey = ?
-                    ''', (loss, current_time, miner_hotkey))
+                    ''', (entry['best_loss'], current_time, entry['data_version'], miner_hotkey))
                     await db.commit()
 
-                logger.info(f"Updated performance for miner {miner_hotkey}: loss = {loss}")
+                logger.info(f"Updated performance for miner {miner_hotkey}: loss = {loss} (eval set {data_version})")
             except Exception as e:
                 logger.error(f"Error updating miner {miner_hotkey} performance: {e}")
 
-    async def get_miner_performances(self) -> Dict[str, float]:
-        """Get the best performance of all miners."""
+    async def get_miner_performances(self, data_version: Optional[str] = None) -> Dict[str, float]:
+        """Get the best performance of all miners, optionally only those scored on `data_version`."""
         async with self.lock:
-            return {hotkey: data['best_loss'] for hotkey, data in self.miners_cache.items()}
+            return self.miners_cache.best_losses(data_version)
 
     async def get_miner_details(self, miner_hotkey: str) -> Dict[str, Any]:
         """Get detailed information about a specific miner."""
@@ -102,6 +579,7 @@ class MinerManager:
             if miner_hotkey not in self.miners_cache:
                 logger.warning(f"Attempt to get details of non-existent miner {miner_hotkey}")
                 return None
+            self._metadata(self.miners_cache[miner_hotkey])
             return self.miners_cache[miner_hotkey]
 
     async def update_miner_metadata(self, miner_hotkey: str, metadata: Dict[str, Any]):
@@ -112,7 +590,8 @@ class MinerManager:
                 return
 
             try:
-                self.miners_cache[miner_hotkey]['metadata'].update(metadata)
+                self._metadata(self.miners_cache[miner_hotkey]).update(metadata)
+                self.miners_cache.touch(miner_hotkey)
                 metadata_json = json.dumps(self.miners_cache[miner_hotkey]['metadata'])
 
                 async with aiosqlite.connect(self.db_path) as db:
@@ -1,10 +1,13 @@
 import bittensor as bt
-from test.miner_manager import MinerManager
-from work_evaluator import WorkEvaluator
+from miner_manager_2 import MinerManager
+from work_evaluator import WorkEvaluator, EvalResult
+from prescreen import SubmissionPrescreener
+from eval_scheduler import EvaluationScheduler, SchedulerFullError
 from reward_distributor import RewardDistributor
+from diagnostics import Diagnostics
 import asyncio
 import logging
-from typing import Tuple
+from typing import Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -27,11 +30,18 @@ class PoolManager:
         self.wallet = bt.wallet(config=self.bt_config)
         self.subtensor = bt.subtensor(config=self.bt_config)
         self.metagraph = self.subtensor.metagraph(self.bt_config.netuid)
-        self.miner_manager = MinerManager(config.get('db_file', 'miners.db'))
+        self.miner_manager = MinerManager(
+            config.get('db_file', 'miners.db'),
+            snapshot_interval=float(config.get('miner_snapshot_interval', 300))
+        )
         self.work_evaluator = WorkEvaluator(config)
+        self.prescreener = SubmissionPrescreener(config, self.work_evaluator.model.state_dict())
+        self.eval_scheduler = EvaluationScheduler(config, weight_fn=self.submission_weight)
         self.reward_distributor = RewardDistributor(config)
+        self.diagnostics = Diagnostics(config)
         self.axon = self.setup_axon()
         self.is_running = False
+        self._tasks = []
         self.reward_interval = config['reward_interval']
 
     def setup_axon(self):
@@ -50,10 +60,17 @@ class PoolManager:
         """Start the pool manager and its components."""
         logger.info("Starting Pool Manager...")
         try:
+            self.diagnostics.start()
+            await self.miner_manager.initialize()
+            self.miner_manager.start_snapshot_loop()
+            # The scheduler must be ready before the axon can deliver submissions.
+            await self.eval_scheduler.initialize()
             await self.axon.start()
             await self.register_neuron()
             self.is_running = True
-            asyncio.create_task(self._reward_loop())
+            self._tasks.append(asyncio.create_task(self._reward_loop()))
+            for _ in range(self.work_evaluator.num_replicas):
+                self._tasks.append(asyncio.create_task(self._evaluation_loop()))
             logger.info("Pool Manager started successfully.")
         except Exception as e:
             logger.exception(f"Failed to start Pool Manager: {e}")
@@ -65,6 +82,14 @@ class PoolManager:
         self.is_running = False
         if self.axon:
             await self.axon.stop()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.eval_scheduler.close()
+        self.work_evaluator.close()
+        await self.miner_manager.close()
+        self.diagnostics.stop()
         logger.info("Pool Manager stopped.")
 
     async def register_neuron(self):
@@ -84,15 +109,68 @@ class PoolManager:
         while self.is_running:
             try:
                 await asyncio.sleep(self.reward_interval)
-                miner_performances = self.miner_manager.get_miner_performances()
+                # Only losses from the current eval set are comparable with each other.
+                miner_performances = await self.miner_manager.get_miner_performances(
+                    self.work_evaluator.eval_data_version
+                )
                 await self.reward_distributor.distribute(miner_performances)
             except Exception as e:
                 logger.error(f"Error in reward distribution: {e}")
 
+    async def _evaluation_loop(self):
+        """Evaluate queued submissions in fair-queued order."""
+        while self.is_running:
+            try:
+                job = await self.eval_scheduler.next_job()
+            except Exception as e:
+                logger.error(f"Error fetching evaluation job: {e}")
+                await asyncio.sleep(1)
+                continue
+            try:
+                await self.process_submission(job.hotkey, job.state_dict)
+            except Exception as e:
+                logger.error(f"Error evaluating submission from {job.hotkey}: {e}")
+            # Not reached on cancellation: an interrupted job stays queued and resumes on restart.
+            await self.eval_scheduler.complete(job)
+
+    async def process_submission(self, miner_hotkey: str, model_state_dict: Dict) -> Optional[EvalResult]:
+        """Prescreen a submission and run the full evaluation only if it passes."""
+        loop = asyncio.get_running_loop()
+        screening = await loop.run_in_executor(None, self.prescreener.screen, miner_hotkey, model_state_dict)
+        if not screening.accepted:
+            return None
+        result = await self.work_evaluator.evaluate_with_timeout(model_state_dict)
+        if result.data_version != self.work_evaluator.eval_data_version:
+            # Scored on an eval set that was swapped out meanwhile; recording it would
+            # reset a best loss already scored on the current set.
+            logger.info(f"Dropping result from {miner_hotkey} on retired eval set {result.data_version}")
+            return None
+        # Miners are registered on their first scored submission.
+        await self.miner_manager.register_miner(miner_hotkey)
+        await self.miner_manager.update_miner_performance(miner_hotkey, result.loss, result.data_version)
+        return result
+
     async def handle_forward(self, synapse: bt.Synapse) -> bt.Synapse:
-        # Implement the forward pass logic here
-        
-        pass
+        """Queue submitted work for evaluation, pushing back when the backlog is full."""
+        work = getattr(synapse, 'work', None)
+        if work is None:
+            return synapse
+        try:
+            await self.eval_scheduler.submit(synapse.dendrite.hotkey, work)
+        except SchedulerFullError as e:
+            logger.warning(f"Rejected submission from {synapse.dendrite.hotkey}: {e}")
+            # Tell the miner its work was dropped so it can back off and resubmit.
+            synapse.axon.status_code = 503
+            synapse.axon.status_message = str(e)
+        return synapse
+
+    def submission_weight(self, hotkey: str) -> float:
+        """Fair-queuing weight of a hotkey: its stake, floored at 1 so unstaked miners are still served."""
+        try:
+            uid = self.metagraph.hotkeys.index(hotkey)
+        except ValueError:
+            return 1.0
+        return max(float(self.metagraph.S[uid]), 1.0)
 
     def blacklist_check(self, synapse: bt.Synapse) -> Tuple[bool, str]:
         """Check if a request should be blacklisted."""
@@ -0,0 +1,131 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, Any, NamedTuple, Optional, Tuple
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+class PrescreenResult(NamedTuple):
+    hotkey: str
+    accepted: bool
+    reason: str
+    timestamp: float
+    duplicate_of: Optional[str] = None
+
+class SubmissionPrescreener:
+    """Cheap checks that weed out degenerate or copied weights before evaluation."""
+    def __init__(self, config: Dict[str, Any], reference_state_dict: Optional[Dict[str, torch.Tensor]] = None):
+        self.max_tensor_norm = float(config.get('prescreen_max_tensor_norm', 1e4))
+        self.duplicate_threshold = float(config.get('prescreen_duplicate_threshold', 0.999))
+        self.sketch_size = int(config.get('prescreen_sketch_size', 256))
+        self.recent_window = float(config.get('prescreen_recent_window', 24 * 3600))
+        self.seed = int(config.get('prescreen_seed', 0))
+        self.expected_shapes = None
+        if reference_state_dict is not None:
+            self.expected_shapes = {name: tuple(t.shape) for name, t in reference_state_dict.items()}
+        # hotkey -> (sketch, digest, timestamp) of its most recent accepted weights
+        self._recent: Dict[str, Tuple[torch.Tensor, str, float]] = {}
+        self._buckets: Optional[torch.Tensor] = None
+        self._signs: Optional[torch.Tensor] = None
+        # screen() runs on executor threads; this guards the index and the bookkeeping.
+        self._lock = threading.Lock()
+        self.rejection_counts = Counter()
+        self.history = deque(maxlen=int(config.get('prescreen_history_size', 1000)))
+
+    def _sketch_params(self, length: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Fixed count-sketch hash buckets and signs for vectors of `length`."""
+        if self._buckets is None or self._buckets.numel() != length:
+            generator = torch.Generator().manual_seed(self.seed)
+            self._buckets = torch.randint(0, self.sketch_size, (length,), generator=generator)
+            self._signs = torch.randint(0, 2, (length,), generator=generator).float() * 2 - 1
+        return self._buckets, self._signs
+
+    def _check_shapes(self, state_dict: Dict[str, torch.Tensor]) -> Optional[str]:
+        if self.expected_shapes is None:
+            return None
+        if set(state_dict) != set(self.expected_shapes):
+            return 'mismatched_keys'
+        for name, shape in self.expected_shapes.items():
+            if tuple(state_dict[name].shape) != shape:
+                return 'mismatched_shape'
+        return None
+
+    def screen(self, hotkey: str, state_dict: Dict[str, torch.Tensor]) -> PrescreenResult:
+        """Screen a submission. Accepted submissions are added to the duplicate index."""
+        now = time.time()
+        reason = self._check_shapes(state_dict)
+        duplicate_of = None
+        if reason is None:
+            names = sorted(state_dict)
+            tensors = [state_dict[name].detach().reshape(-1).float().cpu() for name in names]
+            if not tensors or sum(t.numel() for t in tensors) == 0:
+                reason = 'empty'
+        if reason is None:
+            # One flat vector; per-tensor stats come from a single segmented reduction.
+            flat = torch.cat(tensors)
+            segments = torch.repeat_interleave(
+                torch.arange(len(tensors)), torch.tensor([t.numel() for t in tensors])
+            )
+            norms = torch.zeros(len(tensors)).index_add_(0, segments, flat * flat).sqrt()
+            if not bool(torch.isfinite(flat).all()):
+                reason = 'non_finite'
+            elif not bool(flat.any()):
+                reason = 'all_zero'
+            elif float(norms.max()) > self.max_tensor_norm:
+                reason = 'norm_too_large'
+        if reason is None:
+            digest = hashlib.sha256(flat.numpy()).hexdigest()
+            with self._lock:
+                buckets, signs = self._sketch_params(flat.numel())
+            sketch = torch.zeros(self.sketch_size).index_add_(0, buckets, flat * signs)
+            sketch = sketch / sketch.norm().clamp_min(1e-12)
+            with self._lock:
+                duplicate_of, reason = self._find_duplicate(hotkey, sketch, digest, now)
+                if reason is None:
+                    self._recent[hotkey] = (sketch, digest, now)
+
+        result = PrescreenResult(hotkey, reason is None, reason or 'ok', now, duplicate_of)
+        with self._lock:
+            self.history.append(result)
+            if not result.accepted:
+                self.rejection_counts[result.reason] += 1
+        if not result.accepted:
+            logger.info(f"Prescreen rejected submission from {hotkey}: {result.reason}"
+                        + (f" (duplicate of {duplicate_of})" if duplicate_of else ""))
+        return result
+
+    def _find_duplicate(self, hotkey: str, sketch: torch.Tensor, digest: str, now: float) -> Tuple[Optional[str], Optional[str]]:
+        """Compare against other hotkeys' recent weights; returns (hotkey, reason)."""
+        others = []
+        for other, (other_sketch, other_digest, timestamp) in list(self._recent.items()):
+            if now - timestamp > self.recent_window:
+                del self._recent[other]
+                continue
+            if other == hotkey:
+                continue
+            if other_digest == digest:
+                return other, 'exact_duplicate'
+            others.append((other, other_sketch))
+        if not others:
+            return None, None
+        similarities = torch.stack([s for _, s in others]) @ sketch
+        best = int(similarities.argmax())
+        if float(similarities[best]) >= self.duplicate_threshold:
+            return others[best][0], 'near_duplicate'
+        return None, None
+
+    def forget(self, hotkey: str):
+        """Drop a hotkey from the duplicate index, e.g. when the miner is removed."""
+        with self._lock:
+            self._recent.pop(hotkey, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'indexed_hotkeys': len(self._recent),
+                'rejections': dict(self.rejection_counts),
+            }
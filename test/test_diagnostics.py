@@ -0,0 +1,114 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from diagnostics import Diagnostics, LoopLagWatchdog, SamplingProfiler
+
+def busy_marker_function(stop_event):
+    while not stop_event.is_set():
+        sum(range(1000))
+
+class TestSamplingProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.profiler = SamplingProfiler(interval=0.001, output_dir=self.tmpdir.name)
+
+    def tearDown(self):
+        self.profiler.stop()
+        self.tmpdir.cleanup()
+
+    def test_writes_collapsed_stacks(self):
+        stop_event = threading.Event()
+        worker = threading.Thread(target=busy_marker_function, args=(stop_event,))
+        worker.start()
+        self.profiler.start()
+        time.sleep(0.1)
+        path = self.profiler.stop()
+        stop_event.set()
+        worker.join()
+
+        with open(path) as file:
+            lines = file.read().splitlines()
+        self.assertTrue(any('busy_marker_function' in line for line in lines))
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertTrue(stack)
+            self.assertGreater(int(count), 0)
+
+    def test_windows_in_the_same_second_get_distinct_files(self):
+        paths = set()
+        for _ in range(3):
+            self.profiler.start()
+            paths.add(self.profiler.stop())
+        self.assertEqual(len(paths), 3)
+
+    def test_concurrent_stops_are_safe(self):
+        self.profiler.start()
+        results, errors = [], []
+
+        def stop():
+            try:
+                results.append(self.profiler.stop())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=stop) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len([path for path in results if path]), 1)
+
+    def test_timed_window_stops_itself(self):
+        self.profiler.start(duration=0.05)
+        time.sleep(0.3)
+        self.assertFalse(self.profiler.is_running)
+        self.assertEqual(len(os.listdir(self.tmpdir.name)), 1)
+
+    def test_toggle_off_does_not_wait_for_the_write(self):
+        write_collapsed = self.profiler.write_collapsed
+        written = threading.Event()
+
+        def slow_write(samples, window):
+            time.sleep(0.5)
+            path = write_collapsed(samples, window)
+            written.set()
+            return path
+
+        self.profiler.write_collapsed = slow_write
+        self.profiler.toggle()
+        start = time.monotonic()
+        self.profiler.toggle()
+        self.assertLess(time.monotonic() - start, 0.25)
+        self.assertTrue(written.wait(2))
+        self.assertEqual(len(os.listdir(self.tmpdir.name)), 1)
+
+class TestLoopLagWatchdog(unittest.IsolatedAsyncioTestCase):
+    async def test_reports_blocking_stack(self):
+        watchdog = LoopLagWatchdog(threshold=0.1, interval=0.02)
+        watchdog.start()
+        try:
+            await asyncio.sleep(0.05)
+            with self.assertLogs('diagnostics', level='WARNING') as logs:
+                time.sleep(0.4)
+                await asyncio.sleep(0.05)
+        finally:
+            watchdog.stop()
+        self.assertGreater(watchdog.stats()['max_lag'], 0.3)
+        self.assertTrue(any('blocking stack' in line and 'test_reports_blocking_stack' in line
+                            for line in logs.output))
+
+class TestDiagnosticsConfig(unittest.TestCase):
+    def test_string_flags_from_environment(self):
+        diagnostics = Diagnostics({'profile_on_start': 'false', 'loop_watchdog_enabled': 'False'})
+        self.assertFalse(diagnostics.profile_on_start)
+        self.assertFalse(diagnostics.watchdog_enabled)
+        diagnostics = Diagnostics({'profile_on_start': 'true'})
+        self.assertTrue(diagnostics.profile_on_start)
+        self.assertTrue(diagnostics.watchdog_enabled)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import io
+import os
+import tempfile
+import unittest
+import torch
+from eval_scheduler import EvaluationScheduler, SchedulerFullError
+
+class TestEvaluationScheduler(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.config = {
+            'eval_queue_db': os.path.join(self.tmpdir.name, 'queue.db'),
+            'eval_max_backlog': 3,
+            'eval_submit_timeout': 0.05,
+        }
+        self.scheduler = EvaluationScheduler(self.config)
+        await self.scheduler.initialize()
+
+    async def asyncTearDown(self):
+        await self.scheduler.close()
+        self.tmpdir.cleanup()
+
+    def weights(self, value):
+        return {'weight': torch.full((2, 2), float(value))}
+
+    async def test_coalesces_superseded_submissions(self):
+        first = await self.scheduler.submit('miner_a', self.weights(1))
+        second = await self.scheduler.submit('miner_a', self.weights(2))
+        self.assertEqual(first, second)
+        job = await self.scheduler.next_job()
+        self.assertTrue(torch.equal(job.state_dict['weight'], self.weights(2)['weight']))
+        self.assertEqual(self.scheduler.stats()['coalesced'], 1)
+
+    async def test_heavy_submitter_does_not_starve_others(self):
+        await self.scheduler.submit('heavy', self.weights(0))
+        await self.scheduler.submit('light', self.weights(1))
+        order = []
+        for i in range(3):
+            job = await self.scheduler.next_job()
+            order.append(job.hotkey)
+            await self.scheduler.complete(job)
+            if job.hotkey == 'heavy':
+                # Resubmits right after each of its evaluations
+                await self.scheduler.submit('heavy', self.weights(i + 2))
+        self.assertEqual(order, ['heavy', 'light', 'heavy'])
+
+    async def test_full_backlog_applies_backpressure(self):
+        for i in range(3):
+            await self.scheduler.submit(f'miner_{i}', self.weights(i))
+        with self.assertRaises(SchedulerFullError):
+            await self.scheduler.submit('miner_x', self.weights(9))
+        # A superseding submission takes no extra space and is still accepted.
+        await self.scheduler.submit('miner_0', self.weights(5))
+        self.assertEqual(self.scheduler.stats()['queue_depth'], 3)
+
+    async def test_queue_survives_restart(self):
+        await self.scheduler.submit('miner_a', self.weights(1))
+        await self.scheduler.submit('miner_b', self.weights(2))
+        in_flight = await self.scheduler.next_job()
+        await self.scheduler.close()
+
+        self.scheduler = EvaluationScheduler(self.config)
+        await self.scheduler.initialize()
+        hotkeys = set()
+        for _ in range(2):
+            job = await self.scheduler.next_job()
+            hotkeys.add(job.hotkey)
+            await self.scheduler.complete(job)
+        self.assertEqual(hotkeys, {'miner_a', 'miner_b'})
+        self.assertIn(in_flight.hotkey, hotkeys)
+
+    async def test_resume_refuses_arbitrary_pickles(self):
+        buffer = io.BytesIO()
+        torch.save({'weight': torch.zeros(1), 'payload': PickledObject()}, buffer)
+        await self.scheduler.db.execute(
+            'INSERT INTO eval_jobs (hotkey, enqueued_at, payload) VALUES (?, ?, ?)',
+            ('attacker', 0.0, buffer.getvalue())
+        )
+        await self.scheduler.db.commit()
+        await self.scheduler.submit('miner_a', self.weights(1))
+        await self.scheduler.close()
+
+        self.scheduler = EvaluationScheduler(self.config)
+        await self.scheduler.initialize()
+        self.assertEqual(self.scheduler.stats()['queue_depth'], 1)
+        self.assertEqual((await self.scheduler.next_job()).hotkey, 'miner_a')
+
+class PickledObject:
+    pass
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,230 @@
+import asyncio
+import os
+import struct
+import tempfile
+import threading
+import time
+import unittest
+import aiosqlite
+from database import Database
+from miner_manager_2 import MinerManager, SNAPSHOT_HEADER
+
+class TestMinerManagerSnapshot(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'miners.db')
+
+    async def asyncTearDown(self):
+        self.tmpdir.cleanup()
+
+    async def open_manager(self):
+        manager = MinerManager(self.db_path)
+        await manager.initialize()
+        return manager
+
+    async def populate(self):
+        manager = await self.open_manager()
+        for hotkey in ('a', 'b', 'c'):
+            await manager.register_miner(hotkey)
+        await manager.update_miner_performance('a', 1.0)
+        await manager.update_miner_metadata('b', {'region': 'eu'})
+        await manager.close()
+        return manager
+
+    async def test_round_trip_preserves_cache(self):
+        original = await self.populate()
+        restored = await self.open_manager()
+        self.assertEqual(await restored.get_miner_performances(), await original.get_miner_performances())
+        self.assertEqual((await restored.get_miner_details('b'))['metadata'], {'region': 'eu'})
+
+    async def test_snapshot_header_and_arrays(self):
+        await self.populate()
+        with open(self.db_path + '.snapshot', 'rb') as file:
+            data = file.read()
+        magic, _, count, _, hotkeys_len, versions_len, _ = SNAPSHOT_HEADER.unpack_from(data, 0)
+        self.assertEqual(magic, b'MINERSN3')
+        self.assertEqual(count, 3)
+        hotkeys = data[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + hotkeys_len].decode().split('\n')
+        self.assertEqual(hotkeys, ['a', 'b', 'c'])
+        offset = (SNAPSHOT_HEADER.size + hotkeys_len + versions_len + 7) & ~7
+        self.assertEqual(struct.unpack_from('<3d', data, offset)[0], 1.0)
+
+    async def test_metadata_is_decoded_lazily(self):
+        await self.populate()
+        restored = await self.open_manager()
+        self.assertIsInstance(restored.miners_cache['b']['metadata'], str)
+        self.assertEqual((await restored.get_miner_details('b'))['metadata'], {'region': 'eu'})
+        self.assertIsInstance(restored.miners_cache['b']['metadata'], dict)
+
+    async def test_replays_changes_made_after_snapshot(self):
+        await self.populate()
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("INSERT INTO miners (hotkey, best_loss, last_submission, metadata) VALUES ('d', 2.0, 7, '{}')")
+            await db.execute("UPDATE miners SET best_loss = 0.5 WHERE hotkey = 'b'")
+            await db.execute("DELETE FROM miners WHERE hotkey = 'c'")
+            await db.commit()
+        restored = await self.open_manager()
+        performances = await restored.get_miner_performances()
+        self.assertEqual(set(performances), {'a', 'b', 'd'})
+        self.assertEqual(performances['b'], 0.5)
+        self.assertEqual(performances['d'], 2.0)
+
+    async def test_snapshot_includes_external_writes(self):
+        manager = await self.open_manager()
+        await manager.register_miner('a')
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("UPDATE miners SET best_loss = 0.25 WHERE hotkey = 'a'")
+            await db.commit()
+        await manager.write_snapshot()
+        restored = await self.open_manager()
+        self.assertEqual(await restored.get_miner_performances(), {'a': 0.25})
+
+    async def test_close_waits_for_in_flight_snapshot(self):
+        manager = MinerManager(self.db_path, snapshot_interval=0.01)
+        await manager.initialize()
+        await manager.register_miner('a')
+        await manager.update_miner_performance('a', 2.0)
+        write_file = manager._write_snapshot_file
+        started = threading.Event()
+
+        def slow_first_write(sections):
+            if not started.is_set():
+                started.set()
+                time.sleep(0.2)
+            write_file(sections)
+
+        manager._write_snapshot_file = slow_first_write
+        manager.start_snapshot_loop()
+        while not started.is_set():
+            await asyncio.sleep(0.005)
+        # The periodic snapshot captured loss 2.0 and is still writing it.
+        await manager.update_miner_performance('a', 1.0)
+        await asyncio.gather(manager.close(), manager.write_snapshot())
+        await asyncio.sleep(0.3)
+        self.assertEqual(sorted(os.listdir(self.tmpdir.name)), ['miners.db', 'miners.db.snapshot'])
+        restored = await self.open_manager()
+        self.assertEqual(await restored.get_miner_performances(), {'a': 1.0})
+
+    async def test_warm_restart_materializes_only_changed_miners(self):
+        await self.populate()
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("UPDATE miners SET best_loss = 0.5 WHERE hotkey = 'b'")
+            await db.commit()
+        restored = await self.open_manager()
+        self.assertEqual(await restored.get_miner_performances(),
+                         {'a': 1.0, 'b': 0.5, 'c': float('inf')})
+        self.assertEqual(set(restored.miners_cache._overlay), {'b'})
+
+    async def test_changes_during_snapshot_write_are_kept(self):
+        manager = await self.open_manager()
+        for hotkey in ('a', 'b', 'c'):
+            await manager.register_miner(hotkey)
+        write_file = manager._write_snapshot_file
+
+        def slow_write(sections):
+            time.sleep(0.1)
+            write_file(sections)
+
+        manager._write_snapshot_file = slow_write
+        writing = asyncio.create_task(manager.write_snapshot())
+        await asyncio.sleep(0.05)
+        await manager.update_miner_performance('a', 1.0, 'v1')
+        await manager.remove_miner('c')
+        await writing
+        self.assertEqual(set(manager.miners_cache._overlay), {'a'})
+        self.assertEqual(await manager.get_miner_performances(), {'a': 1.0, 'b': float('inf')})
+
+        manager._write_snapshot_file = write_file
+        await manager.close()
+        self.assertEqual(len(manager.miners_cache._overlay), 0)
+        restored = await self.open_manager()
+        self.assertEqual(await restored.get_miner_performances('v1'), {'a': 1.0})
+        self.assertEqual(set(restored.miners_cache), {'a', 'b'})
+
+    async def test_snapshot_keeps_best_loss(self):
+        manager = await self.open_manager()
+        await manager.register_miner('a')
+        await manager.update_miner_performance('a', 1.0)
+        await manager.update_miner_performance('a', 5.0)
+        await manager.write_snapshot()
+        self.assertEqual(await manager.get_miner_performances(), {'a': 1.0})
+        restored = await self.open_manager()
+        self.assertEqual(await restored.get_miner_performances(), {'a': 1.0})
+
+    async def test_best_loss_is_tracked_per_eval_version(self):
+        manager = await self.open_manager()
+        await manager.register_miner('a')
+        await manager.register_miner('b')
+        await manager.update_miner_performance('a', 1.0, 'v1')
+        await manager.update_miner_performance('b', 2.0, 'v1')
+        await manager.update_miner_performance('a', 3.0, 'v2')
+        self.assertEqual(await manager.get_miner_performances('v2'), {'a': 3.0})
+        self.assertEqual(await manager.get_miner_performances('v1'), {'b': 2.0})
+        await manager.close()
+        restored = await self.open_manager()
+        self.assertEqual(await restored.get_miner_performances('v2'), {'a': 3.0})
+
+    async def test_version_shared_by_snapshot_and_new_scores(self):
+        manager = await self.open_manager()
+        for hotkey in ('a', 'b'):
+            await manager.register_miner(hotkey)
+            await manager.update_miner_performance(hotkey, 2.0, 'v1')
+        await manager.write_snapshot()
+        await manager.update_miner_performance('a', 1.0, 'v1')
+        await manager.write_snapshot()
+        self.assertEqual(await manager.get_miner_performances('v1'), {'a': 1.0, 'b': 2.0})
+        restored = await self.open_manager()
+        self.assertEqual(await restored.get_miner_performances('v1'), {'a': 1.0, 'b': 2.0})
+
+    async def test_metadata_updates_do_not_touch_eval_version(self):
+        manager = await self.open_manager()
+        await manager.register_miner('a')
+        await manager.update_miner_performance('a', 1.0, 'v1')
+        await manager.update_miner_metadata('a', {'data_version': 'bogus', 'region': 'eu'})
+        self.assertEqual(await manager.get_miner_performances('v1'), {'a': 1.0})
+        await manager.close()
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute("SELECT data_version FROM miners WHERE hotkey = 'a'") as cursor:
+                self.assertEqual((await cursor.fetchone())[0], 'v1')
+        restored = await self.open_manager()
+        self.assertEqual(await restored.get_miner_performances('v1'), {'a': 1.0})
+
+    async def test_ignores_snapshot_of_another_database(self):
+        await self.populate()
+        os.remove(self.db_path)
+        restored = await self.open_manager()
+        self.assertEqual(restored.miners_cache, {})
+
+    async def test_falls_back_on_bad_magic(self):
+        await self.populate()
+        with open(self.db_path + '.snapshot', 'r+b') as file:
+            file.write(b'GARBAGE!')
+        restored = await self.open_manager()
+        self.assertEqual(set(restored.miners_cache), {'a', 'b', 'c'})
+        self.assertEqual(restored.miners_cache['a']['best_loss'], 1.0)
+
+    async def test_falls_back_on_truncated_snapshot(self):
+        await self.populate()
+        path = self.db_path + '.snapshot'
+        with open(path, 'r+b') as file:
+            file.truncate(os.path.getsize(path) - 3)
+        restored = await self.open_manager()
+        self.assertEqual(set(restored.miners_cache), {'a', 'b', 'c'})
+
+    async def test_migrates_legacy_database(self):
+        legacy = Database(self.db_path)
+        legacy.register_miner('scored')
+        legacy.register_miner('unscored')
+        legacy.update_miner_performance('scored', 0.75, 100)
+        legacy.close()
+
+        manager = await self.open_manager()
+        self.assertEqual(await manager.get_miner_performances(), {'scored': 0.75, 'unscored': float('inf')})
+        await manager.update_miner_performance('unscored', 2.0)
+        await manager.update_miner_metadata('scored', {'region': 'eu'})
+        await manager.close()
+        restored = await self.open_manager()
+        self.assertEqual(await restored.get_miner_performances(), {'scored': 0.75, 'unscored': 2.0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
+import asyncio
 import unittest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from pool_manager import PoolManager, AxonSetupError, NeuronRegistrationError
+from eval_scheduler import SchedulerFullError
+from work_evaluator import EvalResult
 import bittensor as bt
 
 class TestPoolManager(unittest.TestCase):
@@ -64,5 +67,31 @@ class TestPoolManager(unittest.TestCase):
         with self.assertRaises(NeuronRegistrationError):
             await self.pool_manager.register_neuron()
 
+    def test_submission_weight_follows_stake(self):
+        self.pool_manager.metagraph.hotkeys = ['staked', 'unstaked']
+        self.pool_manager.metagraph.S = [250.0, 0.0]
+        self.assertEqual(self.pool_manager.submission_weight('staked'), 250.0)
+        self.assertEqual(self.pool_manager.submission_weight('unstaked'), 1.0)
+        self.assertEqual(self.pool_manager.submission_weight('unknown'), 1.0)
+
+    def test_full_backlog_is_reported_on_the_synapse(self):
+        self.pool_manager.eval_scheduler = Mock()
+        self.pool_manager.eval_scheduler.submit = AsyncMock(side_effect=SchedulerFullError("backlog full"))
+        synapse = Mock()
+        synapse.work = {'weight': None}
+        response = asyncio.run(self.pool_manager.handle_forward(synapse))
+        self.assertEqual(response.axon.status_code, 503)
+        self.assertEqual(response.axon.status_message, "backlog full")
+
+    def test_results_on_a_retired_eval_set_are_dropped(self):
+        self.pool_manager.prescreener = Mock()
+        self.pool_manager.prescreener.screen.return_value = Mock(accepted=True)
+        self.pool_manager.work_evaluator = Mock(eval_data_version='v2')
+        self.pool_manager.work_evaluator.evaluate_with_timeout = AsyncMock(return_value=EvalResult(9.0, 'v1'))
+        self.pool_manager.miner_manager = Mock()
+        self.pool_manager.miner_manager.update_miner_performance = AsyncMock()
+        self.assertIsNone(asyncio.run(self.pool_manager.process_submission('miner', {})))
+        self.pool_manager.miner_manager.update_miner_performance.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
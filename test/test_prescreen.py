@@ -0,0 +1,59 @@
+import unittest
+import torch
+from prescreen import SubmissionPrescreener
+
+class TestSubmissionPrescreener(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.reference = {'weight': torch.randn(8, 4), 'bias': torch.randn(8)}
+        self.prescreener = SubmissionPrescreener({}, self.reference)
+
+    def make_weights(self):
+        return {name: torch.randn_like(t) for name, t in self.reference.items()}
+
+    def test_accepts_plausible_weights(self):
+        result = self.prescreener.screen('miner_a', self.make_weights())
+        self.assertTrue(result.accepted)
+        self.assertEqual(result.reason, 'ok')
+
+    def test_rejects_non_finite(self):
+        weights = self.make_weights()
+        weights['bias'][0] = float('nan')
+        result = self.prescreener.screen('miner_a', weights)
+        self.assertFalse(result.accepted)
+        self.assertEqual(result.reason, 'non_finite')
+
+    def test_rejects_all_zero(self):
+        weights = {name: torch.zeros_like(t) for name, t in self.reference.items()}
+        self.assertEqual(self.prescreener.screen('miner_a', weights).reason, 'all_zero')
+
+    def test_rejects_absurd_norm(self):
+        weights = self.make_weights()
+        weights['weight'] *= 1e6
+        self.assertEqual(self.prescreener.screen('miner_a', weights).reason, 'norm_too_large')
+
+    def test_rejects_mismatched_shape(self):
+        weights = self.make_weights()
+        weights['bias'] = torch.randn(9)
+        self.assertEqual(self.prescreener.screen('miner_a', weights).reason, 'mismatched_shape')
+
+    def test_flags_exact_and_near_duplicates(self):
+        weights = self.make_weights()
+        self.assertTrue(self.prescreener.screen('miner_a', weights).accepted)
+
+        exact = self.prescreener.screen('miner_b', {k: v.clone() for k, v in weights.items()})
+        self.assertEqual(exact.reason, 'exact_duplicate')
+        self.assertEqual(exact.duplicate_of, 'miner_a')
+
+        nudged = {k: v + 1e-6 * torch.randn_like(v) for k, v in weights.items()}
+        near = self.prescreener.screen('miner_c', nudged)
+        self.assertEqual(near.reason, 'near_duplicate')
+        self.assertEqual(self.prescreener.stats()['rejections']['near_duplicate'], 1)
+
+    def test_resubmission_by_same_hotkey_is_not_a_duplicate(self):
+        weights = self.make_weights()
+        self.assertTrue(self.prescreener.screen('miner_a', weights).accepted)
+        self.assertTrue(self.prescreener.screen('miner_a', weights).accepted)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import asyncio
+import threading
+import unittest
+import torch
+from torch.utils.data import TensorDataset
+from work_evaluator import WorkEvaluator
+
+class TestEvalDataVersioning(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.evaluator = WorkEvaluator({'eval_num_workers': 0, 'eval_batch_size': 1000})
+
+    def tearDown(self):
+        self.evaluator.close()
+
+    def new_data(self):
+        return TensorDataset(torch.randn(100, 10), torch.randn(100, 1))
+
+    def test_version_depends_on_content_only(self):
+        data = self.new_data()
+        copy = TensorDataset(*(t.clone() for t in data.tensors))
+        self.assertEqual(WorkEvaluator.compute_data_version(data), WorkEvaluator.compute_data_version(copy))
+        self.assertNotEqual(WorkEvaluator.compute_data_version(data), WorkEvaluator.compute_data_version(self.new_data()))
+
+    def test_version_supports_bfloat16(self):
+        data = TensorDataset(torch.randn(10, 4).bfloat16())
+        self.assertEqual(len(WorkEvaluator.compute_data_version(data)), 16)
+
+    def test_swap_without_preload_raises(self):
+        with self.assertRaises(RuntimeError):
+            self.evaluator.swap_eval_data()
+
+    async def test_preload_then_swap(self):
+        old_version = self.evaluator.eval_data_version
+        new_version = await self.evaluator.preload_eval_data(self.new_data())
+        self.assertEqual(self.evaluator.eval_data_version, old_version)
+        self.assertEqual(self.evaluator.swap_eval_data(), new_version)
+        result = await self.evaluator.evaluate(self.evaluator.model.state_dict())
+        self.assertEqual(result.data_version, new_version)
+
+    async def test_in_flight_evaluation_finishes_on_starting_version(self):
+        old_version = self.evaluator.eval_data_version
+        state_dict = {k: v.clone() for k, v in self.evaluator.model.state_dict().items()}
+        entered, release = threading.Event(), threading.Event()
+        loss_fn = self.evaluator.loss_fn
+
+        def blocking_loss(outputs, targets):
+            entered.set()
+            release.wait(5)
+            return loss_fn(outputs, targets)
+
+        self.evaluator.loss_fn = blocking_loss
+        in_flight = asyncio.create_task(self.evaluator.evaluate(state_dict))
+        while not entered.is_set():
+            await asyncio.sleep(0.01)
+
+        await self.evaluator.preload_eval_data(self.new_data())
+        new_version = self.evaluator.swap_eval_data()
+        release.set()
+
+        self.assertEqual((await in_flight).data_version, old_version)
+        self.assertEqual((await self.evaluator.evaluate(state_dict)).data_version, new_version)
+
+class TestModelReplicaPool(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.evaluator = WorkEvaluator({'eval_replicas': 3, 'eval_batch_size': 1000})
+
+    def tearDown(self):
+        self.evaluator.close()
+
+    def random_weights(self):
+        return {k: torch.randn_like(v) for k, v in self.evaluator.model.state_dict().items()}
+
+    async def wait_for_all_replicas(self):
+        for _ in range(100):
+            if self.evaluator._replicas.qsize() == self.evaluator.num_replicas:
+                return
+            await asyncio.sleep(0.01)
+        self.fail("replicas were not returned to the pool")
+
+    def test_load_weights_copies_into_existing_storage(self):
+        replica = self.evaluator._replicas.get_nowait()
+        pointers = {name: t.data_ptr() for name, t in replica.model.state_dict().items()}
+        weights = self.random_weights()
+        replica.load_weights_(weights)
+        for name, tensor in replica.model.state_dict().items():
+            self.assertEqual(tensor.data_ptr(), pointers[name])
+            self.assertTrue(torch.equal(tensor, weights[name]))
+        with self.assertRaises(RuntimeError):
+            replica.load_weights_({'0.weight': torch.zeros(1)})
+
+    async def test_concurrent_results_match_serial(self):
+        submissions = [self.random_weights() for _ in range(6)]
+        serial = [(await self.evaluator.evaluate(sd)).loss for sd in submissions]
+        concurrent = await asyncio.gather(*(self.evaluator.evaluate(sd) for sd in submissions))
+        self.assertEqual([result.loss for result in concurrent], serial)
+        await self.wait_for_all_replicas()
+
+    async def test_replica_returned_after_error(self):
+        with self.assertRaises(RuntimeError):
+            await self.evaluator.evaluate({'bogus': torch.zeros(1)})
+        await self.wait_for_all_replicas()
+
+    async def test_timeout_does_not_count_wait_for_replica(self):
+        release = threading.Event()
+        loss_fn = self.evaluator.loss_fn
+
+        def blocking_loss(outputs, targets):
+            release.wait(5)
+            return loss_fn(outputs, targets)
+
+        self.evaluator.loss_fn = blocking_loss
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.gather(*(self.evaluator.evaluate_with_timeout(self.random_weights(), 0.05)
+                                   for _ in range(self.evaluator.num_replicas)))
+        # Every replica is still held by a timed-out thread; the next job waits for one
+        # instead of burning its own deadline in the queue.
+        self.evaluator.loss_fn = loss_fn
+        queued = asyncio.create_task(self.evaluator.evaluate_with_timeout(self.random_weights(), 0.3))
+        await asyncio.sleep(0.5)
+        release.set()
+        self.assertGreaterEqual((await queued).loss, 0.0)
+        await self.wait_for_all_replicas()
+
+    async def test_timeout_is_logged_once(self):
+        release = threading.Event()
+        loss_fn = self.evaluator.loss_fn
+        self.evaluator.loss_fn = lambda outputs, targets: release.wait(5) and loss_fn(outputs, targets)
+        with self.assertLogs('work_evaluator', 'ERROR') as logs:
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.evaluator.evaluate_with_timeout(self.random_weights(), 0.05)
+        release.set()
+        self.assertEqual(len(logs.records), 1)
+        await self.wait_for_all_replicas()
+
+class TestReplicaReturnAfterLoopClosed(unittest.TestCase):
+    def test_finishing_after_loop_closed_is_harmless(self):
+        evaluator = WorkEvaluator({'eval_replicas': 1})
+        release = threading.Event()
+        loss_fn = evaluator.loss_fn
+        evaluator.loss_fn = lambda outputs, targets: release.wait(5) and loss_fn(outputs, targets)
+
+        async def time_out():
+            with self.assertRaises(asyncio.TimeoutError):
+                await evaluator.evaluate(evaluator.model.state_dict(), 0.05)
+
+        asyncio.run(time_out())
+        with self.assertNoLogs('concurrent.futures'):
+            release.set()
+            evaluator._executor.shutdown(wait=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
 import logging
 import asyncio
-from typing import Dict, Any
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, NamedTuple, Optional
 
 import torch
 import torch.nn as nn
@@ -8,22 +11,80 @@ from torch.utils.data import DataLoader, TensorDataset
 
 logger = logging.getLogger(__name__)
 
+HASH_CHUNK_BYTES = 1 << 24
+
+class EvalResult(NamedTuple):
+    """A loss tagged with the version of the eval set that produced it."""
+    loss: float
+    data_version: str
+
+class EvalDataVersion:
+    """An immutable, content-versioned evaluation dataset and its loader."""
+    def __init__(self, version: str, data: TensorDataset, loader: DataLoader):
+        self.version = version
+        self.data = data
+        self.loader = loader
+
+class ModelReplica:
+    """A preallocated model whose parameters are overwritten in place per evaluation."""
+    def __init__(self, model: nn.Module):
+        self.model = model
+        self.model.eval()
+        # state_dict() tensors share storage with the module, so copying into them updates it.
+        self.tensors = model.state_dict()
+
+    def load_weights_(self, state_dict: Dict[str, torch.Tensor]):
+        """Copy submitted weights into the existing storage without reallocating."""
+        missing = self.tensors.keys() - state_dict.keys()
+        unexpected = state_dict.keys() - self.tensors.keys()
+        if missing or unexpected:
+            raise RuntimeError(f"Mismatched state dict: missing {sorted(missing)}, unexpected {sorted(unexpected)}")
+        with torch.no_grad():
+            for name, tensor in self.tensors.items():
+                source = state_dict[name]
+                if source.shape != tensor.shape:
+                    raise RuntimeError(f"Size mismatch for {name}: {tuple(source.shape)} vs {tuple(tensor.shape)}")
+                tensor.copy_(source)
+
 class WorkEvaluator:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model = self.create_model().to(self.device)
         self.loss_fn = nn.MSELoss()
-        self.eval_data = self.load_eval_data()
+        # Each concurrent evaluation checks out its own replica and runs on the thread pool.
+        self.num_replicas = max(1, int(config.get('eval_replicas', 1)))
+        self._replicas = asyncio.Queue()
+        for model in [self.model] + [self.create_model().to(self.device) for _ in range(self.num_replicas - 1)]:
+            self._replicas.put_nowait(ModelReplica(model))
+        self._executor = ThreadPoolExecutor(max_workers=self.num_replicas, thread_name_prefix='evaluator')
         self.batch_size = config.get('eval_batch_size', 64)
-        self.num_workers = config.get('eval_num_workers', 4)
-        self.eval_loader = DataLoader(
-            self.eval_data,
-            batch_size=self.batch_size,
-            shuffle=False,
-            num_workers=self.num_workers,
-            pin_memory=True
-        )
+        # Evaluation runs on worker threads, and forking DataLoader workers from a threaded
+        # process risks deadlocks; the eval set is in memory, so load it in-process.
+        self.num_workers = int(config.get('eval_num_workers', 0))
+        if self.num_replicas > 1 and self.num_workers > 0:
+            logger.warning("eval_num_workers is ignored when eval_replicas > 1")
+            self.num_workers = 0
+        # torch's intra-op pool is process-wide: split the cores between replicas.
+        intra_op_threads = config.get('eval_intra_op_threads')
+        if intra_op_threads is None and self.num_replicas > 1:
+            intra_op_threads = max(1, (os.cpu_count() or 1) // self.num_replicas)
+        if intra_op_threads is not None:
+            torch.set_num_threads(int(intra_op_threads))
+        self._current_eval = self._build_eval_version(self.load_eval_data())
+        self._pending_eval: Optional[EvalDataVersion] = None
+
+    @property
+    def eval_data(self) -> TensorDataset:
+        return self._current_eval.data
+
+    @property
+    def eval_loader(self) -> DataLoader:
+        return self._current_eval.loader
+
+    @property
+    def eval_data_version(self) -> str:
+        return self._current_eval.version
 
     def create_model(self) -> nn.Module:
         """Create the model architecture."""
@@ -43,55 +104,124 @@ class WorkEvaluator:
         y = torch.randn(10000, 1)
         return TensorDataset(x, y)
 
-    async def evaluate(self, model_state_dict: Dict[str, torch.Tensor]) -> float:
-        """Evaluate the submitted model."""
-        try:
-            # Load the submitted state dict
-            self.model.load_state_dict(model_state_dict)
-            self.model.eval()
-
-            total_loss = 0.0
-            total_samples = 0
-
-            with torch.no_grad():
-                for batch in self.eval_loader:
-                    inputs, targets = batch
-                    inputs = inputs.to(self.device)
-                    targets = targets.to(self.device)
-
-                    outputs = self.model(inputs)
-                    loss = self.loss_fn(outputs, targets)
+    @staticmethod
+    def compute_data_version(data: TensorDataset) -> str:
+        """Compute a content hash identifying the evaluation dataset."""
+        digest = hashlib.sha256()
+        for tensor in data.tensors:
+            tensor = tensor.detach().cpu().contiguous()
+            digest.update(str(tensor.dtype).encode())
+            digest.update(str(tuple(tensor.shape)).encode())
+            # Hash the raw storage in chunks: no full copy, and works for dtypes numpy lacks (bf16).
+            raw = tensor.reshape(-1).view(torch.uint8)
+            for start in range(0, raw.numel(), HASH_CHUNK_BYTES):
+                digest.update(raw[start:start + HASH_CHUNK_BYTES].numpy())
+        return digest.hexdigest()[:16]
 
-                    total_loss += loss.item() * inputs.size(0)
-                    total_samples += inputs.size(0)
+    def _build_eval_version(self, data: TensorDataset) -> EvalDataVersion:
+        """Hash the dataset and build its loader, ready to be swapped in."""
+        version = self.compute_data_version(data)
+        loader = DataLoader(
+            data,
+            batch_size=self.batch_size,
+            shuffle=False,
+            num_workers=self.num_workers,
+            pin_memory=self.device.type == 'cuda'
+        )
+        return EvalDataVersion(version, data, loader)
 
-            avg_loss = total_loss / total_samples
-            logger.info(f"Evaluation completed. Average loss: {avg_loss}")
-            return avg_loss
+    async def evaluate(self, model_state_dict: Dict[str, torch.Tensor], timeout: Optional[float] = None) -> EvalResult:
+        """Evaluate the submitted model.
 
-        except Exception as e:
-            logger.error(f"Error during work evaluation: {e}")
+        The eval set is captured once at the start, so an evaluation always
+        finishes on the version it started with even if a swap happens meanwhile.
+        `timeout` covers the computation only, not the wait for a free replica.
+        """
+        eval_version = self._current_eval
+        loop = asyncio.get_running_loop()
+        replica = await self._replicas.get()
+        try:
+            future = self._executor.submit(self._evaluate_replica, replica, model_state_dict, eval_version)
+        except Exception:
+            self._replicas.put_nowait(replica)
             raise
-
-    async def evaluate_with_timeout(self, model_state_dict: Dict[str, torch.Tensor], timeout: float = 30.0) -> float:
-        """Evaluate the submitted model with a timeout."""
+        # Return the replica only once the thread is done with it, even if we are cancelled first.
+        future.add_done_callback(lambda _: self._return_replica(loop, replica))
         try:
-            return await asyncio.wait_for(self.evaluate(model_state_dict), timeout)
+            avg_loss = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            logger.info(f"Evaluation completed on eval set {eval_version.version}. Average loss: {avg_loss}")
+            return EvalResult(avg_loss, eval_version.version)
+
         except asyncio.TimeoutError:
-            logger.error("Evaluation timed out")
+            logger.error(f"Evaluation timed out after {timeout}s")
             raise
         except Exception as e:
             logger.error(f"Error during work evaluation: {e}")
             raise
 
-    def update_eval_data(self, new_data: TensorDataset):
+    def _return_replica(self, loop: asyncio.AbstractEventLoop, replica: ModelReplica):
+        """Put a replica back in the pool. Called from the evaluating thread."""
+        if loop.is_closed():
+            # The loop (and the queue bound to it) went away while the thread was still running.
+            return
+        try:
+            loop.call_soon_threadsafe(self._replicas.put_nowait, replica)
+        except RuntimeError:
+            # Closed between the check and the call.
+            pass
+
+    def _evaluate_replica(self, replica: ModelReplica, model_state_dict: Dict[str, torch.Tensor],
+                          eval_version: EvalDataVersion) -> float:
+        """Run one evaluation on a checked-out replica. Called from the thread pool."""
+        replica.load_weights_(model_state_dict)
+
+        total_loss = 0.0
+        total_samples = 0
+
+        with torch.no_grad():
+            for batch in eval_version.loader:
+                inputs, targets = batch
+                inputs = inputs.to(self.device)
+                targets = targets.to(self.device)
+
+                outputs = replica.model(inputs)
+                loss = self.loss_fn(outputs, targets)
+
+                total_loss += loss.item() * inputs.size(0)
+                total_samples += inputs.size(0)
+
+        return total_loss / total_samples
+
+    async def evaluate_with_timeout(self, model_state_dict: Dict[str, torch.Tensor], timeout: float = 30.0) -> EvalResult:
+        """Evaluate the submitted model with a timeout. Failures are logged by `evaluate`."""
+        return await self.evaluate(model_state_dict, timeout)
+
+    def close(self):
+        """Shut down the evaluation thread pool without blocking the event loop."""
+        self._executor.shutdown(wait=False)
+
+    async def preload_eval_data(self, new_data: TensorDataset) -> str:
+        """Prepare the next eval set in the background without activating it."""
+        loop = asyncio.get_running_loop()
+        pending = await loop.run_in_executor(None, self._build_eval_version, new_data)
+        self._pending_eval = pending
+        logger.info(f"Preloaded evaluation dataset version {pending.version}")
+        return pending.version
+
+    def swap_eval_data(self) -> str:
+        """Activate the preloaded eval set. New evaluations pick it up immediately."""
+        if self._pending_eval is None:
+            raise RuntimeError("No preloaded evaluation dataset to swap in")
+        pending, self._pending_eval = self._pending_eval, None
+        return self._activate_eval_version(pending)
+
+    def update_eval_data(self, new_data: TensorDataset) -> str:
         """Update the evaluation dataset."""
-        self.eval_data = new_data
-        self.eval_loader = DataLoader(
-            self.eval_data,
-            batch_size=self.batch_size,
-            shuffle=False,
-            num_workers=self.num_workers,
-            pin_memory=True
-        )
-        logger.info("Evaluation dataset updated")
\ No newline at end of file
+        return self._activate_eval_version(self._build_eval_version(new_data))
+
+    def _activate_eval_version(self, eval_version: EvalDataVersion) -> str:
+        previous = self._current_eval.version
+        # A single reference assignment: in-flight evaluations keep the old object.
+        self._current_eval = eval_version
+        logger.info(f"Evaluation dataset updated: {previous} -> {eval_version.version}")
+        return eval_version.version